@@ -4,12 +4,1424 @@ Generate QR codes with custom colors, logos, and batch processing.
 """
 
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, colorchooser
+from tkinter import ttk, filedialog, messagebox, colorchooser, simpledialog
 import qrcode
-from PIL import Image, ImageTk, ImageDraw
+import qrcode.util
+import qrcode.base
+from PIL import Image, ImageTk, ImageDraw, ImageFont
 import os
+import base64
+import zlib
+import bisect
+import struct
+import csv
+import time
+import shutil
+import re
+import string
+import json
+import hashlib
+import argparse
+import urllib.parse
+import sqlite3
+import tempfile
+import threading
+import queue
+import zipfile
 import pyperclip
-from io import BytesIO
+from io import BytesIO, TextIOWrapper
+from collections import OrderedDict, deque
+from functools import lru_cache
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.elsakr-qr', 'cache')
+DEFAULT_CACHE_MB = 512
+# Part of every cache key: bump whenever encoding or rendering changes so output
+# cached by an older build is never served again
+RENDER_VERSION = 2
+
+
+class RenderCache:
+    """Persistent cache of encoded PNG/SVG output shared across sessions and processes.
+
+    Blobs are stored content-addressed under ``blobs/`` and indexed in SQLite by
+    payload, error correction level, style hash and format. The least recently
+    used entries are evicted once the cache grows past ``max_bytes``.
+    """
+    
+    def __init__(self, directory, max_bytes=DEFAULT_CACHE_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(directory, 'blobs'), exist_ok=True)
+        
+        # Autocommit mode; writes take an IMMEDIATE lock so concurrent batch
+        # workers serialize on the index instead of failing mid-transaction
+        self.db = sqlite3.connect(os.path.join(directory, 'index.sqlite3'), timeout=30,
+                                  isolation_level=None, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        # A cache can afford to lose its last writes on power loss; skip the per-commit fsync
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        with self.transaction():
+            self.db.execute('''CREATE TABLE IF NOT EXISTS entries (
+                payload TEXT NOT NULL, ec INTEGER NOT NULL, style TEXT NOT NULL, format TEXT NOT NULL,
+                blob TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL,
+                PRIMARY KEY (payload, ec, style, format))''')
+            self.db.execute('CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)')
+            self.db.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            self.db.execute("INSERT OR IGNORE INTO meta VALUES ('total_size', 0)")
+    
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            self.db.execute('BEGIN IMMEDIATE')
+            try:
+                yield
+            except BaseException:
+                self.db.execute('ROLLBACK')
+                raise
+            self.db.execute('COMMIT')
+    
+    def blob_path(self, digest, fmt):
+        return os.path.join(self.directory, 'blobs', digest[:2], f"{digest}.{fmt}")
+    
+    def get(self, payload, ec, style, fmt):
+        """Return the cached bytes, or None on a miss"""
+        with self.lock:
+            row = self.db.execute('SELECT blob FROM entries WHERE payload=? AND ec=? AND style=? AND format=?',
+                                  (payload, ec, style, fmt)).fetchone()
+        if row is None:
+            return None
+        
+        try:
+            with open(self.blob_path(row[0], fmt), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            # Evicted by another process between the lookup and the read
+            return None
+        
+        with self.transaction():
+            self.db.execute('UPDATE entries SET last_used=? WHERE payload=? AND ec=? AND style=? AND format=?',
+                            (time.time(), payload, ec, style, fmt))
+        return data
+    
+    def put(self, payload, ec, style, fmt, data):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest, fmt)
+        if not os.path.exists(path):
+            # Write to a temporary name and rename so readers never see partial blobs
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        
+        key = (payload, ec, style, fmt)
+        with self.transaction():
+            row = self.db.execute('SELECT size FROM entries WHERE payload=? AND ec=? AND style=? AND format=?',
+                                  key).fetchone()
+            growth = len(data) - (row[0] if row else 0)
+            self.db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)',
+                            key + (digest, len(data), time.time()))
+            self.db.execute("UPDATE meta SET value = value + ? WHERE name='total_size'", (growth,))
+            evicted = self.evict()
+        self.remove_orphans(evicted)
+    
+    def evict(self):
+        """Drop least recently used entries until the cache is back under 90% of its budget.
+
+        Must be called inside a transaction. Returns the (blob, format) pairs that
+        lost a reference.
+        """
+        total = self.db.execute("SELECT value FROM meta WHERE name='total_size'").fetchone()[0]
+        if total <= self.max_bytes:
+            return []
+        
+        evicted = []
+        target = self.max_bytes * 0.9
+        rows = self.db.execute('SELECT rowid, blob, format, size FROM entries ORDER BY last_used').fetchall()
+        for rowid, blob, fmt, size in rows:
+            if total <= target:
+                break
+            self.db.execute('DELETE FROM entries WHERE rowid=?', (rowid,))
+            total -= size
+            evicted.append((blob, fmt))
+        self.db.execute("UPDATE meta SET value=? WHERE name='total_size'", (total,))
+        return evicted
+    
+    def remove_orphans(self, blobs):
+        for blob, fmt in blobs:
+            with self.lock:
+                still_used = self.db.execute('SELECT 1 FROM entries WHERE blob=? LIMIT 1', (blob,)).fetchone()
+            if not still_used:
+                try:
+                    os.remove(self.blob_path(blob, fmt))
+                except FileNotFoundError:
+                    pass
+
+
+def hex_to_rgb(hex_color):
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+
+@lru_cache(maxsize=32)
+def load_font(size):
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except OSError:
+        try:
+            return ImageFont.truetype("Arial.ttf", size)
+        except OSError:
+            try:
+                return ImageFont.load_default(size)
+            except TypeError:
+                # Pillow < 10.1 only has the fixed-size bitmap font
+                return ImageFont.load_default()
+
+
+class KanjiData(qrcode.util.QRData):
+    """Kanji mode segment: 13 bits per Shift JIS double-byte character.
+
+    ``qrcode.util.QRData`` only handles numeric, alphanumeric and byte modes,
+    where the same character costs 16 bits as Shift JIS or 24 as UTF-8.
+    """
+    
+    def __init__(self, data):
+        self.mode = qrcode.util.MODE_KANJI
+        self.data = data.encode('shift_jis')
+    
+    def __len__(self):
+        return len(self.data) // 2
+    
+    def write(self, buffer):
+        data = self.data
+        for i in range(0, len(data), 2):
+            code = (data[i] << 8) | data[i + 1]
+            code -= 0x8140 if code <= 0x9FFC else 0xC140
+            buffer.put((code >> 8) * 0xC0 + (code & 0xFF), 13)
+
+
+def is_kanji(char):
+    """Whether char is a Shift JIS double-byte character that Kanji mode can hold"""
+    try:
+        encoded = char.encode('shift_jis')
+    except UnicodeEncodeError:
+        return False
+    if len(encoded) != 2:
+        return False
+    code = (encoded[0] << 8) | encoded[1]
+    return 0x8140 <= code <= 0x9FFC or 0xE040 <= code <= 0xEBBF
+
+
+def kanji_saving(chars):
+    """Bits saved by writing chars in Kanji mode instead of as UTF-8 bytes.
+
+    Kanji take 24 bits as UTF-8 and save 11 each, but Greek, Cyrillic and most
+    symbols take only 16 and save 3.
+    """
+    return sum(8 * len(char.encode('utf-8')) - 13 for char in chars)
+
+
+def fold_kanji_runs(runs, version):
+    """Merge (is_kanji, chars) runs, keeping a Kanji segment only where its saving
+    beats the segment headers it costs at version's header widths"""
+    kanji_header = 4 + qrcode.util.length_in_bits(qrcode.util.MODE_KANJI, version)
+    byte_header = 4 + qrcode.util.length_in_bits(qrcode.util.MODE_8BIT_BYTE, version)
+    merged = []
+    for i, (kanji, chars) in enumerate(runs):
+        neighbours = (i > 0) + (i < len(runs) - 1)
+        # A run in the middle splits the byte segment around it in two; a run
+        # that is the whole payload replaces the byte segment's header
+        header = kanji_header + (byte_header if neighbours == 2 else -byte_header if not neighbours else 0)
+        if kanji and kanji_saving(chars) <= header:
+            kanji = False
+        if merged and not merged[-1][0] and not kanji:
+            merged[-1][1].extend(chars)
+        else:
+            merged.append((kanji, list(chars)))
+    return merged
+
+
+def data_chunks(data, minimum=20, error_correction=qrcode.constants.ERROR_CORRECT_H):
+    """Segment data like ``qrcode.util.optimal_data_chunks``, adding Kanji mode.
+
+    Segment header widths grow at versions 10 and 27, so Kanji runs are folded
+    into the surrounding bytes once for each width. Whichever segmentation,
+    including the plain one, fits the smallest version (then fewest bits) is
+    used, so Kanji mode never makes a code larger.
+    """
+    if isinstance(data, bytes) or data.isascii():
+        yield from qrcode.util.optimal_data_chunks(data, minimum=minimum)
+        return
+    
+    runs = []
+    for char in data:
+        kanji = is_kanji(char)
+        if runs and runs[-1][0] == kanji:
+            runs[-1][1].append(char)
+        else:
+            runs.append((kanji, [char]))
+    
+    candidates = [list(qrcode.util.optimal_data_chunks(data, minimum=minimum))]
+    for version in (1, 10, 27):
+        chunks = []
+        for kanji, chars in fold_kanji_runs(runs, version):
+            if kanji:
+                chunks.append(KanjiData(''.join(chars)))
+            else:
+                chunks.extend(qrcode.util.optimal_data_chunks(''.join(chars), minimum=minimum))
+        candidates.append(chunks)
+    
+    def size(chunks):
+        version, used_bits = fit_version([(chunk.mode, chunk_bits(chunk)) for chunk in chunks], error_correction)
+        return version or 41, used_bits
+    yield from min(candidates, key=size)
+
+
+def build_qr(data, version=None):
+    """Encode data; pass the version from estimate_capacity to skip the fitting pass"""
+    qr = qrcode.QRCode(
+        version=version or 1,
+        error_correction=qrcode.constants.ERROR_CORRECT_H,
+        box_size=10,
+        border=2
+    )
+    for chunk in data_chunks(data):
+        qr.add_data(chunk)
+    qr.make(fit=version is None)
+    return qr
+
+
+def chunk_bits(chunk):
+    """Number of data bits a QRData chunk writes, excluding the mode and length headers"""
+    length = len(chunk)
+    if chunk.mode == qrcode.util.MODE_NUMBER:
+        return length // 3 * 10 + (0, 4, 7)[length % 3]
+    if chunk.mode == qrcode.util.MODE_ALPHA_NUM:
+        return length // 2 * 11 + length % 2 * 6
+    if chunk.mode == qrcode.util.MODE_KANJI:
+        return length * 13
+    return length * 8
+
+
+def fit_version(chunks, error_correction):
+    """Smallest version that holds chunks given as (mode, data bits).
+
+    Mirrors ``QRCode.best_fit``. Returns (version, used bits), with version None
+    past version 40.
+    """
+    limits = qrcode.util.BIT_LIMIT_TABLE[error_correction]
+    version = 1
+    while True:
+        mode_sizes = qrcode.util.mode_sizes_for_version(version)
+        used_bits = sum(4 + mode_sizes[mode] + bits for mode, bits in chunks)
+        version = bisect.bisect_left(limits, used_bits, version)
+        if version > 40:
+            return None, used_bits
+        # A larger version may need wider length fields; refit if so
+        if qrcode.util.mode_sizes_for_version(version) is mode_sizes:
+            return version, used_bits
+
+
+def estimate_capacity(data, error_correction=qrcode.constants.ERROR_CORRECT_H):
+    """Predict the version data will encode to, in O(len(data)) without building a matrix.
+
+    Mirrors the segmentation of ``build_qr`` and the fitting of
+    ``QRCode.best_fit``. Returns a dict with ``version`` (None if it overflows
+    version 40), ``modules`` per side, and ``used_bits``/``capacity_bits``/
+    ``remaining_bits`` for that version.
+    """
+    limits = qrcode.util.BIT_LIMIT_TABLE[error_correction]
+    version, used_bits = fit_version([(chunk.mode, chunk_bits(chunk))
+                                      for chunk in data_chunks(data, error_correction=error_correction)],
+                                     error_correction)
+    if version is None:
+        return {'version': None, 'modules': None, 'used_bits': used_bits,
+                'capacity_bits': limits[40], 'remaining_bits': limits[40] - used_bits}
+    return {'version': version, 'modules': version * 4 + 17, 'used_bits': used_bits,
+            'capacity_bits': limits[version], 'remaining_bits': limits[version] - used_bits}
+
+
+def split_template(template):
+    """Split a sequence template into its constant prefix and the format string for the rest.
+
+    ``https://elsakr.company/t/{n:06d}`` gives ``('https://elsakr.company/t/', '{n:06d}')``.
+    """
+    parts = list(string.Formatter().parse(template))
+    if not any(field is not None for _, field, _, _ in parts):
+        raise ValueError("Template needs a {n} placeholder, e.g. https://elsakr.company/t/{n:06d}")
+    
+    def escape(text):
+        return text.replace('{', '{{').replace('}', '}}')
+    
+    prefix = ''
+    suffix = ''
+    for literal, field, spec, conversion in parts:
+        if not suffix:
+            prefix += literal
+        else:
+            suffix += escape(literal)
+        if field is not None:
+            suffix += '{' + field + (f"!{conversion}" if conversion else '') + (f":{spec}" if spec else '') + '}'
+    return prefix, suffix
+
+
+def parse_range(spec):
+    """``'1-1000'`` or ``'1-1000:5'`` (inclusive, with a step) as a range"""
+    match = re.fullmatch(r'\s*(\d+)\s*-\s*(\d+)\s*(?::\s*(\d+)\s*)?', spec)
+    if not match:
+        raise ValueError(f"Invalid range '{spec}' (expected START-END or START-END:STEP)")
+    start, stop, step = int(match[1]), int(match[2]), int(match[3] or 1)
+    if stop < start or step < 1:
+        raise ValueError(f"Invalid range '{spec}'")
+    return range(start, stop + 1, step)
+
+
+class SequenceEncoder:
+    """Encode many payloads that share a constant prefix.
+
+    The prefix's segments are turned into bits once and the version is fixed up
+    front from the longest suffix, so each row only encodes its own suffix
+    before error correction. Every code of a run therefore has the same size.
+    The mask is scored on the first row and reused for the rest of the run:
+    scoring all eight masks is most of the cost of encoding a row, and any mask
+    yields a valid code.
+    """
+    
+    def __init__(self, prefix, suffixes, error_correction=qrcode.constants.ERROR_CORRECT_H):
+        self.prefix = prefix
+        self.error_correction = error_correction
+        prefix_chunks = list(data_chunks(prefix, error_correction=error_correction)) if prefix else []
+        prefix_sizes = [(chunk.mode, chunk_bits(chunk)) for chunk in prefix_chunks]
+        
+        self.version = 0
+        for suffix in suffixes:
+            suffix_sizes = [(chunk.mode, chunk_bits(chunk))
+                            for chunk in data_chunks(suffix, error_correction=error_correction)]
+            version, used_bits = fit_version(prefix_sizes + suffix_sizes, error_correction)
+            if version is None:
+                raise ValueError(f"'{prefix}{suffix}' is too long for a QR code")
+            self.version = max(self.version, version)
+        
+        self.prefix_bits = qrcode.util.BitBuffer()
+        self.write_chunks(self.prefix_bits, prefix_chunks)
+        self.rs_blocks = qrcode.base.rs_blocks(self.version, error_correction)
+        self.bit_limit = sum(block.data_count * 8 for block in self.rs_blocks)
+        self.mask_pattern = None
+    
+    def write_chunks(self, buffer, chunks):
+        for chunk in chunks:
+            buffer.put(chunk.mode, 4)
+            buffer.put(len(chunk), qrcode.util.length_in_bits(chunk.mode, self.version))
+            chunk.write(buffer)
+    
+    def encode(self, suffix):
+        """QRCode for prefix + suffix, made at the run's version"""
+        buffer = qrcode.util.BitBuffer()
+        buffer.buffer = self.prefix_bits.buffer[:]
+        buffer.length = self.prefix_bits.length
+        self.write_chunks(buffer, data_chunks(suffix, error_correction=self.error_correction))
+        if len(buffer) > self.bit_limit:
+            # Longer than the suffixes the version was chosen for
+            return build_qr(self.prefix + suffix)
+        
+        # Terminator, byte alignment and pad codewords as in qrcode.util.create_data
+        for _ in range(min(self.bit_limit - len(buffer), 4)):
+            buffer.put_bit(False)
+        if len(buffer) % 8:
+            for _ in range(8 - len(buffer) % 8):
+                buffer.put_bit(False)
+        for i in range((self.bit_limit - len(buffer)) // 8):
+            buffer.put(qrcode.util.PAD0 if i % 2 == 0 else qrcode.util.PAD1, 8)
+        
+        qr = qrcode.QRCode(version=self.version, error_correction=self.error_correction, box_size=10, border=2)
+        qr.data_cache = qrcode.util.create_bytes(buffer, self.rs_blocks)
+        if self.mask_pattern is None:
+            self.mask_pattern = qr.best_mask_pattern()
+        qr.makeImpl(False, self.mask_pattern)
+        return qr
+
+
+def qr_layout(matrix_size, style, has_logo, box_size=10):
+    """Pixel geometry of a styled QR code.
+
+    The frame measurements are tuned for the default ``box_size`` of 10 and scale
+    with it, so every element lands on the same place at any resolution.
+    """
+    scale = box_size / 10
+    def sc(value):
+        return max(1, round(value * scale))
+    
+    qr_size = matrix_size * box_size
+    layout = {'box_size': box_size, 'qr_size': qr_size, 'qr_x': 0, 'qr_y': 0,
+              'width': qr_size, 'height': qr_size, 'frame': style['frame'], 'logo': None}
+    
+    if not style['frame']:
+        # Logo in the center of the QR body, on a square of the background color
+        if has_logo:
+            logo_size = int(qr_size * 0.25)
+            pad = sc(10)
+            layout['logo'] = ((qr_size - logo_size) // 2, (qr_size - logo_size) // 2, logo_size)
+            layout['logo_bg'] = ((qr_size - logo_size - pad) // 2, (qr_size - logo_size - pad) // 2,
+                                 logo_size + pad)
+        return layout
+    
+    # Frame: logo on top, QR in the middle, text at the bottom
+    padding = sc(20)
+    border_width = sc(10)
+    text_height = sc(50)
+    logo_size = sc(60)
+    logo_area_height = sc(80) if has_logo else 0
+    
+    width = qr_size + (padding * 2) + (border_width * 2)
+    height = qr_size + (padding * 2) + (border_width * 2) + text_height + logo_area_height
+    layout.update(width=width, height=height, border_width=border_width, radius=sc(20),
+                  inner_radius=sc(15), small_radius=sc(8))
+    
+    current_y = border_width + padding
+    if has_logo:
+        logo_bg_x = (width - logo_size - sc(20)) // 2
+        layout['logo_box'] = [logo_bg_x, current_y, logo_bg_x + logo_size + sc(20), current_y + logo_size + sc(10)]
+        layout['logo'] = ((width - logo_size) // 2, current_y + sc(5), logo_size)
+        current_y += logo_size + sc(20)
+    
+    layout['qr_x'] = border_width + padding
+    layout['qr_y'] = current_y
+    current_y += qr_size + sc(5)
+    
+    text_bg_padding = sc(10)
+    text_bg_width = width - (border_width * 2) - (padding * 2) + (text_bg_padding * 2)
+    text_bg_x = border_width + padding - text_bg_padding
+    layout['text_box'] = [text_bg_x, current_y, text_bg_x + text_bg_width, current_y + text_height - sc(10)]
+    
+    font = load_font(sc(24))
+    text = style['frame_text'].upper()
+    text_bbox = ImageDraw.Draw(Image.new('RGB', (1, 1))).textbbox((0, 0), text, font=font)
+    text_width = text_bbox[2] - text_bbox[0]
+    layout['text'] = text
+    layout['font'] = font
+    layout['font_size'] = sc(24)
+    layout['text_width'] = text_width
+    layout['text_pos'] = ((width - text_width) // 2,
+                          current_y + (text_height - sc(10)) // 2 - (text_bbox[3] - text_bbox[1]) // 2)
+    ascent = font.getmetrics()[0] if hasattr(font, 'getmetrics') else text_bbox[3]
+    layout['text_baseline'] = layout['text_pos'][1] + ascent
+    return layout
+
+
+def render_strip(matrix, layout, style, logo, top, bottom):
+    """Render rows ``top`` to ``bottom`` of the styled QR code.
+
+    Only the part of each element that falls inside the strip is drawn, so the
+    memory needed is bounded by the strip rather than by the whole image. The QR
+    body is built from the module matrix and scaled by whole boxes, keeping module
+    edges crisp at any resolution.
+    """
+    fg_rgb = hex_to_rgb(style['fg'])
+    bg_rgb = hex_to_rgb(style['bg'])
+    width = layout['width']
+    strip = Image.new('RGB', (width, bottom - top), bg_rgb)
+    draw = ImageDraw.Draw(strip)
+    
+    def visible(box):
+        return box[1] < bottom and box[3] >= top
+    
+    def shift(box):
+        return [box[0], box[1] - top, box[2], box[3] - top]
+    
+    if layout['frame']:
+        border_width = layout['border_width']
+        height = layout['height']
+        # Outer rounded rectangle border, then the inner background
+        draw.rounded_rectangle(shift([0, 0, width - 1, height - 1]),
+                               radius=layout['radius'], fill=fg_rgb, outline=fg_rgb)
+        draw.rounded_rectangle(shift([border_width, border_width, width - border_width - 1, height - border_width - 1]),
+                               radius=layout['inner_radius'], fill=bg_rgb, outline=bg_rgb)
+        if logo and visible(layout['logo_box']):
+            draw.rounded_rectangle(shift(layout['logo_box']), radius=layout['small_radius'],
+                                   fill=hex_to_rgb(style['logo_bg']))
+    
+    # QR body: each module row that intersects this strip is expanded only for
+    # the pixel rows inside it, so the mask never outgrows the strip
+    box_size = layout['box_size']
+    qr_x, qr_y = layout['qr_x'], layout['qr_y']
+    start = max(top, qr_y)
+    end = min(bottom, qr_y + len(matrix) * box_size)
+    if start < end:
+        dark, light = b'\xff' * box_size, b'\x00' * box_size
+        lines = []
+        for row in range((start - qr_y) // box_size, (end - qr_y - 1) // box_size + 1):
+            row_top = qr_y + row * box_size
+            line = b''.join(dark if module else light for module in matrix[row])
+            lines.append(line * (min(end, row_top + box_size) - max(start, row_top)))
+        mask = Image.frombytes('L', (len(matrix) * box_size, end - start), b''.join(lines))
+        strip.paste(fg_rgb, (qr_x, start - top), mask)
+    
+    if logo and layout['logo']:
+        logo_x, logo_y, logo_size = layout['logo']
+        if not layout['frame']:
+            # Background square behind the centered logo
+            bg_x, bg_y, bg_size = layout['logo_bg']
+            if visible([bg_x, bg_y, bg_x + bg_size, bg_y + bg_size - 1]):
+                strip.paste(bg_rgb, (qr_x + bg_x, qr_y + bg_y - top, qr_x + bg_x + bg_size, qr_y + bg_y + bg_size - top))
+            logo_x += qr_x
+            logo_y += qr_y
+        
+        # Resample only the slice of the logo that lands in this strip
+        start = max(top, logo_y)
+        end = min(bottom, logo_y + logo_size)
+        if start < end:
+            ratio = logo.height / logo_size
+            part = logo.resize((logo_size, end - start), Image.Resampling.LANCZOS,
+                               box=(0, (start - logo_y) * ratio, logo.width, (end - logo_y) * ratio))
+            if part.mode == 'RGBA':
+                part = part.convert('RGB')
+            strip.paste(part, (logo_x, start - top))
+    
+    if layout['frame'] and visible(layout['text_box']):
+        draw.rounded_rectangle(shift(layout['text_box']), radius=layout['small_radius'],
+                               fill=hex_to_rgb(style['text_bg']))
+        text_x, text_y = layout['text_pos']
+        draw.text((text_x, text_y - top), layout['text'], fill=hex_to_rgb(style['text_color']), font=layout['font'])
+    
+    return strip
+
+
+def render_qr(matrix, style, logo=None, box_size=10):
+    """Render the full styled QR image for a module matrix"""
+    layout = qr_layout(len(matrix), style, logo is not None, box_size)
+    return render_strip(matrix, layout, style, logo, 0, layout['height'])
+
+
+# Share of codewords each error correction level can restore
+EC_BUDGET = {
+    qrcode.constants.ERROR_CORRECT_L: 0.07,
+    qrcode.constants.ERROR_CORRECT_M: 0.15,
+    qrcode.constants.ERROR_CORRECT_Q: 0.25,
+    qrcode.constants.ERROR_CORRECT_H: 0.30,
+}
+MIN_CONTRAST = 3.0
+
+
+def contrast_ratio(fg_rgb, bg_rgb):
+    """WCAG contrast ratio between two colors (1 to 21)"""
+    def luminance(rgb):
+        channels = [c / 255 for c in rgb]
+        channels = [c / 12.92 if c <= 0.03928 else ((c + 0.055) / 1.055) ** 2.4 for c in channels]
+        return 0.2126 * channels[0] + 0.7152 * channels[1] + 0.0722 * channels[2]
+    
+    lighter, darker = sorted((luminance(fg_rgb), luminance(bg_rgb)), reverse=True)
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+def verify_render(image, matrix, style, has_logo, box_size=10,
+                  error_correction=qrcode.constants.ERROR_CORRECT_H):
+    """Check that a rendered image still carries its module matrix.
+
+    Samples the center of every module using the known layout, compares it with
+    the matrix and weighs the damage (logo overlay included) against the error
+    correction budget. Returns a dict with ``damage``, ``budget``, ``contrast``
+    and a list of ``problems``; ``ok`` is True when there are none.
+    """
+    layout = qr_layout(len(matrix), style, has_logo, box_size)
+    size = len(matrix)
+    x, y = layout['qr_x'], layout['qr_y']
+    # Nearest-neighbour downscaling by a whole box samples exactly the module centers
+    grid = image.resize((size, size), Image.Resampling.NEAREST,
+                        box=(x, y, x + size * box_size, y + size * box_size)).convert('L')
+    
+    fg_rgb = hex_to_rgb(style['fg'])
+    bg_rgb = hex_to_rgb(style['bg'])
+    def gray(rgb):
+        return (rgb[0] * 299 + rgb[1] * 587 + rgb[2] * 114) // 1000
+    fg_level, bg_level = gray(fg_rgb), gray(bg_rgb)
+    
+    sampled = grid.tobytes()
+    expected = [module for row in matrix for module in row]
+    errors = [(abs(level - fg_level) < abs(level - bg_level)) != module for level, module in zip(sampled, expected)]
+    
+    # Finder patterns have no error correction; any damage there is fatal
+    quiet = next((i for i, row in enumerate(matrix) if any(row)), 0)
+    symbol = size - 2 * quiet
+    finder_errors = 0
+    for top, left in ((quiet, quiet), (quiet, quiet + symbol - 7), (quiet + symbol - 7, quiet)):
+        for r in range(top, top + 7):
+            finder_errors += sum(errors[r * size + left:r * size + left + 7])
+    
+    damage = sum(errors) / (symbol * symbol)
+    budget = EC_BUDGET[error_correction]
+    contrast = contrast_ratio(fg_rgb, bg_rgb)
+    
+    problems = []
+    if finder_errors:
+        problems.append(f"{finder_errors} finder pattern modules damaged")
+    if damage > budget:
+        problems.append(f"{damage:.0%} of modules damaged, over the {budget:.0%} error correction budget")
+    if contrast < MIN_CONTRAST:
+        problems.append(f"low contrast ({contrast:.1f}:1, need {MIN_CONTRAST:.0f}:1)")
+    if fg_level > bg_level:
+        problems.append("inverted colors (light modules on dark background)")
+    return {'ok': not problems, 'damage': damage, 'budget': budget, 'contrast': contrast, 'problems': problems}
+
+
+def style_hash(style, logo_digest=None):
+    key = tuple(sorted(style.items())) + (logo_digest, RENDER_VERSION)
+    return hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+
+
+def matrix_runs(matrix):
+    """(row, start, length) for every horizontal run of dark modules"""
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < len(row):
+            if row[x]:
+                start = x
+                while x < len(row) and row[x]:
+                    x += 1
+                yield y, start, x - start
+            else:
+                x += 1
+
+
+def embedded_logo(logo, size):
+    """Logo as drawn on the raster output (without transparency), kept at up to 4x
+    its display size for vector files"""
+    logo = logo.convert('RGB')
+    if max(logo.size) > size * 4:
+        logo = logo.resize((size * 4, size * 4), Image.Resampling.LANCZOS)
+    return logo
+
+
+def vector_boxes(layout, style, has_logo):
+    """(x, y, width, height, radius, color) of every filled shape under the QR body and logo"""
+    boxes = [(0, 0, layout['width'], layout['height'], 0, style['bg'])]
+    
+    def box(corners, radius, color):
+        x0, y0, x1, y1 = corners
+        boxes.append((x0, y0, x1 - x0 + 1, y1 - y0 + 1, radius, color))
+    
+    if layout['frame']:
+        border_width = layout['border_width']
+        box([0, 0, layout['width'] - 1, layout['height'] - 1], layout['radius'], style['fg'])
+        box([border_width, border_width, layout['width'] - border_width - 1, layout['height'] - border_width - 1],
+            layout['inner_radius'], style['bg'])
+        if has_logo:
+            box(layout['logo_box'], layout['small_radius'], style['logo_bg'])
+        box(layout['text_box'], layout['small_radius'], style['text_bg'])
+    return boxes
+
+
+def logo_placement(layout):
+    """(x, y, size) of the logo and the (x, y, size) background square behind it, if any"""
+    logo_x, logo_y, logo_size = layout['logo']
+    if layout['frame']:
+        return (logo_x, logo_y, logo_size), None
+    bg_x, bg_y, bg_size = layout['logo_bg']
+    return ((layout['qr_x'] + logo_x, layout['qr_y'] + logo_y, logo_size),
+            (layout['qr_x'] + bg_x, layout['qr_y'] + bg_y, bg_size))
+
+
+def matrix_to_svg(matrix, style, logo=None):
+    """Vector QR code in the style colors with the same frame, logo and caption as the PNG"""
+    layout = qr_layout(len(matrix), style, logo is not None)
+    width, height, box_size = layout['width'], layout['height'], layout['box_size']
+    elements = [f'<rect x="{x}" y="{y}" width="{w}" height="{h}" rx="{r}" fill="{color}"/>'
+                for x, y, w, h, r, color in vector_boxes(layout, style, logo is not None)]
+    path = ''.join(f"M{x} {y}h{length}v1h-{length}z" for y, x, length in matrix_runs(matrix))
+    elements.append(f'<path transform="translate({layout["qr_x"]} {layout["qr_y"]}) scale({box_size})" '
+                    f'fill="{style["fg"]}" d="{path}"/>')
+    
+    if logo is not None and layout['logo']:
+        (logo_x, logo_y, logo_size), background = logo_placement(layout)
+        if background:
+            bg_x, bg_y, bg_size = background
+            elements.append(f'<rect x="{bg_x}" y="{bg_y}" width="{bg_size}" height="{bg_size}" fill="{style["bg"]}"/>')
+        output = BytesIO()
+        embedded_logo(logo, logo_size).save(output, 'PNG')
+        elements.append(f'<image x="{logo_x}" y="{logo_y}" width="{logo_size}" height="{logo_size}" '
+                        f'preserveAspectRatio="none" href="data:image/png;base64,'
+                        f'{base64.b64encode(output.getvalue()).decode("ascii")}"/>')
+    
+    if layout['frame']:
+        text = layout['text'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        elements.append(f'<text x="{width / 2}" y="{layout["text_baseline"]}" text-anchor="middle" '
+                        f'font-family="Arial, Helvetica, sans-serif" '
+                        f'font-size="{layout["font_size"]}" fill="{style["text_color"]}">{text}</text>')
+    
+    return (f'<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+            f'width="{width}" height="{height}" shape-rendering="crispEdges">'
+            + ''.join(elements) + '</svg>\n').encode('utf-8')
+
+
+def matrix_to_pdf(matrix, style, logo=None, module_points=10):
+    """Single-page vector PDF with the same frame, logo and caption as the PNG, one point per pixel"""
+    layout = qr_layout(len(matrix), style, logo is not None, module_points)
+    width, height = layout['width'], layout['height']
+    def fill(hex_color):
+        return ' '.join(f"{c / 255:.3f}" for c in hex_to_rgb(hex_color)) + ' rg'
+    
+    def rounded_rect(x, y, w, h, r):
+        # PDF's origin is the bottom-left corner
+        y = height - y - h
+        if not r:
+            return f"{x} {y} {w} {h} re f"
+        k = r * 0.4477  # distance of the Bezier control points from the corner
+        return (f"{x + r} {y} m {x + w - r} {y} l {x + w - k} {y} {x + w} {y + k} {x + w} {y + r} c "
+                f"{x + w} {y + h - r} l {x + w} {y + h - k} {x + w - k} {y + h} {x + w - r} {y + h} c "
+                f"{x + r} {y + h} l {x + k} {y + h} {x} {y + h - k} {x} {y + h - r} c "
+                f"{x} {y + r} l {x} {y + k} {x + k} {y} {x + r} {y} c f")
+    
+    commands = []
+    for x, y, w, h, r, color in vector_boxes(layout, style, logo is not None):
+        commands += [fill(color), rounded_rect(x, y, w, h, r)]
+    commands.append(fill(style['fg']))
+    commands.extend(f"{layout['qr_x'] + x * module_points} {height - layout['qr_y'] - (y + 1) * module_points} "
+                    f"{length * module_points} {module_points} re"
+                    for y, x, length in matrix_runs(matrix))
+    commands.append('f')
+    
+    images = []
+    def place_image(image, x, y, w, h):
+        images.append(image.convert('RGB'))
+        commands.append(f"q {w} 0 0 {h} {x} {height - y - h} cm /Im{len(images)} Do Q")
+    
+    if logo is not None and layout['logo']:
+        (logo_x, logo_y, logo_size), background = logo_placement(layout)
+        if background:
+            bg_x, bg_y, bg_size = background
+            commands += [fill(style['bg']), rounded_rect(bg_x, bg_y, bg_size, bg_size, 0)]
+        place_image(embedded_logo(logo, logo_size), logo_x, logo_y, logo_size, logo_size)
+    
+    font = False
+    if layout['frame']:
+        text_box = layout['text_box']
+        size = layout['font_size']
+        try:
+            text = layout['text'].encode('cp1252')
+            # Arial, measured for the PNG, shares Helvetica's metrics
+            font = True
+            escaped = text.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)').decode('latin-1')
+            commands += [fill(style['text_color']),
+                         f"BT /F1 {size} Tf {(width - layout['text_width']) / 2} {height - layout['text_baseline']} Td "
+                         f"({escaped}) Tj ET"]
+        except UnicodeEncodeError:
+            # The standard fonts can't show this caption; embed it as a 4x raster
+            # between the rounded corners of its box
+            inset = layout['small_radius']
+            box = (text_box[0] + inset, text_box[1], text_box[2] + 1 - inset, text_box[3] + 1)
+            caption = Image.new('RGB', ((box[2] - box[0]) * 4, (box[3] - box[1]) * 4), hex_to_rgb(style['text_bg']))
+            ImageDraw.Draw(caption).text(((layout['text_pos'][0] - box[0]) * 4, (layout['text_pos'][1] - box[1]) * 4),
+                                         layout['text'], fill=hex_to_rgb(style['text_color']), font=load_font(size * 4))
+            place_image(caption, box[0], box[1], box[2] - box[0], box[3] - box[1])
+    
+    stream = zlib.compress('\n'.join(commands).encode('latin-1'))
+    first_image = 6 if font else 5
+    resources = []
+    if font:
+        resources.append("/Font << /F1 5 0 R >>")
+    if images:
+        resources.append("/XObject << " + ' '.join(f"/Im{i} {first_image + i - 1} 0 R" for i in range(1, len(images) + 1)) + " >>")
+    
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] /Contents 4 0 R "
+        f"/Resources << {' '.join(resources)} >> >>".encode('ascii'),
+        f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode('ascii') + stream + b"\nendstream",
+    ]
+    if font:
+        objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    for image in images:
+        pixels = zlib.compress(image.tobytes())
+        objects.append(f"<< /Type /XObject /Subtype /Image /Width {image.width} /Height {image.height} "
+                       f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /FlateDecode /Length {len(pixels)} >>\n"
+                       f"stream\n".encode('ascii') + pixels + b"\nendstream")
+    
+    output = BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(output.tell())
+        output.write(f"{number} 0 obj\n".encode('ascii') + body + b"\nendobj\n")
+    xref = output.tell()
+    output.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('ascii'))
+    for offset in offsets:
+        output.write(f"{offset:010d} 00000 n \n".encode('ascii'))
+    output.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('ascii'))
+    return output.getvalue()
+
+
+def render_svg(data, style):
+    return matrix_to_svg(build_qr(data).get_matrix(), style)
+
+
+# Deliverables per profile: (format, target width in px); None is the standard preview size
+EXPORT_PROFILES = {
+    'PNG': [('png', None)],
+    'PNG + SVG': [('png', None), ('svg', None)],
+    'PNG 300px + PNG 1200px + SVG + PDF': [('png', 300), ('png', 1200), ('svg', None), ('pdf', None)],
+    'Print: PNG 2400px + PDF': [('png', 2400), ('pdf', None)],
+}
+DEFAULT_PROFILE = 'PNG'
+
+
+def fit_box_size(matrix_size, style, width):
+    """Largest whole number of pixels per module that keeps the image within width"""
+    return width // (matrix_size + (6 if style['frame'] else 0))
+
+
+def pad_to_width(image, width, color):
+    """Extend the quiet zone evenly on every side so the image is exactly width pixels wide"""
+    margin = width - image.width
+    if not margin:
+        return image
+    padded = Image.new(image.mode, (width, image.height + margin), color)
+    padded.paste(image, (margin // 2, margin // 2))
+    return padded
+
+
+def deliverable_suffix(fmt, width=None):
+    """File name suffix (with extension) of an export profile entry"""
+    return f"_{width}px.{fmt}" if width else f".{fmt}"
+
+
+def render_deliverable(matrix, style, logo, fmt, width=None):
+    """Render one export profile entry straight from the module matrix.
+
+    Raster sizes change the box size instead of resizing a finished image, so
+    every size stays crisp, and the pixels left over go to the quiet zone so the
+    width is exact.
+    """
+    if fmt == 'svg':
+        return matrix_to_svg(matrix, style, logo)
+    if fmt == 'pdf':
+        return matrix_to_pdf(matrix, style, logo)
+    
+    output = BytesIO()
+    if width:
+        box_size = fit_box_size(len(matrix), style, width)
+        if box_size < 1:
+            raise ValueError(f"{width}px is too small for a {len(matrix)}-module code")
+        pad_to_width(render_qr(matrix, style, logo, box_size), width, hex_to_rgb(style['bg'])).save(output, 'PNG')
+    else:
+        render_qr(matrix, style, logo).save(output, 'PNG')
+    return output.getvalue()
+
+
+def render_payload(data, style, fmt, cache=None):
+    """Encoded PNG or SVG bytes for data, consulting the render cache first"""
+    key = style_hash(style)
+    if cache:
+        cached = cache.get(data, qrcode.constants.ERROR_CORRECT_H, key, fmt)
+        if cached:
+            return cached
+    
+    verified = True
+    if fmt == 'svg':
+        result = render_svg(data, style)
+    else:
+        matrix = build_qr(data).get_matrix()
+        image = render_qr(matrix, style)
+        verified = verify_render(image, matrix, style, False)['ok']
+        output = BytesIO()
+        image.save(output, 'PNG')
+        result = output.getvalue()
+    # Only verified renders are cached, so a cache hit is always known-good
+    if cache and verified:
+        cache.put(data, qrcode.constants.ERROR_CORRECT_H, key, fmt, result)
+    return result
+
+
+def iter_strips(matrix, layout, style, logo, strip_bytes=8 * 1024 * 1024):
+    rows_per_strip = max(1, strip_bytes // (layout['width'] * 3))
+    for top in range(0, layout['height'], rows_per_strip):
+        yield render_strip(matrix, layout, style, logo, top, min(top + rows_per_strip, layout['height']))
+
+
+def write_png_strips(file_path, width, height, strips, dpi):
+    """Stream RGB strips into a PNG file without holding the full image"""
+    def write_chunk(f, kind, data):
+        f.write(struct.pack('>I', len(data)) + kind + data)
+        f.write(struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF))
+    
+    stride = width * 3
+    with open(file_path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        write_chunk(f, b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        pixels_per_meter = round(dpi / 0.0254)
+        write_chunk(f, b'pHYs', struct.pack('>IIB', pixels_per_meter, pixels_per_meter, 1))
+        compressor = zlib.compressobj(6)
+        for strip in strips:
+            raw = strip.tobytes()
+            # Filter type 0 (None) for every scanline
+            data = compressor.compress(b''.join(b'\x00' + raw[i:i + stride] for i in range(0, len(raw), stride)))
+            if data:
+                write_chunk(f, b'IDAT', data)
+        write_chunk(f, b'IDAT', compressor.flush())
+        write_chunk(f, b'IEND', b'')
+
+
+def write_tiff_strips(file_path, width, height, strips, dpi):
+    """Stream RGB strips into a deflate-compressed TIFF, one TIFF strip per strip"""
+    offsets = []
+    counts = []
+    rows_per_strip = None
+    with open(file_path, 'wb') as f:
+        f.write(b'II*\x00\x00\x00\x00\x00')  # IFD offset is patched in at the end
+        for strip in strips:
+            if rows_per_strip is None:
+                rows_per_strip = strip.height
+            data = zlib.compress(strip.tobytes(), 6)
+            offsets.append(f.tell())
+            counts.append(len(data))
+            f.write(data)
+        
+        # Out-of-line tag values
+        if f.tell() % 2:
+            f.write(b'\x00')
+        bits_offset = f.tell()
+        f.write(struct.pack('<3H', 8, 8, 8))
+        resolution_offset = f.tell()
+        f.write(struct.pack('<2I', dpi, 1))
+        offsets_offset = f.tell()
+        f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        counts_offset = f.tell()
+        f.write(struct.pack(f'<{len(counts)}I', *counts))
+        
+        SHORT, LONG, RATIONAL = 3, 4, 5
+        single = len(offsets) == 1
+        tags = [
+            (256, LONG, 1, width),
+            (257, LONG, 1, height),
+            (258, SHORT, 3, bits_offset),
+            (259, SHORT, 1, 8),  # Adobe deflate
+            (262, SHORT, 1, 2),  # RGB
+            (273, LONG, len(offsets), offsets[0] if single else offsets_offset),
+            (277, SHORT, 1, 3),
+            (278, LONG, 1, rows_per_strip or height),
+            (279, LONG, len(counts), counts[0] if single else counts_offset),
+            (282, RATIONAL, 1, resolution_offset),
+            (283, RATIONAL, 1, resolution_offset),
+            (296, SHORT, 1, 2),  # inches
+        ]
+        ifd_offset = f.tell()
+        f.write(struct.pack('<H', len(tags)))
+        for tag, kind, count, value in tags:
+            if kind == SHORT and count == 1:
+                f.write(struct.pack('<HHIHH', tag, kind, count, value, 0))
+            else:
+                f.write(struct.pack('<HHII', tag, kind, count, value))
+        f.write(struct.pack('<I', 0))
+        f.seek(4)
+        f.write(struct.pack('<I', ifd_offset))
+
+
+def export_print(matrix, style, logo, file_path, width_inches, dpi):
+    """Render a QR code at a physical print size in bounded memory.
+
+    The box size is the largest whole number of pixels per module that fits the
+    requested width, so the result is at most ``width_inches`` wide. Returns the
+    (width, height) in pixels.
+    """
+    box_size = fit_box_size(len(matrix), style, int(width_inches * dpi))
+    if box_size < 1:
+        raise ValueError(f"{width_inches} in at {dpi} DPI is too small for a {len(matrix)}-module code")
+    
+    layout = qr_layout(len(matrix), style, logo is not None, box_size)
+    strips = iter_strips(matrix, layout, style, logo)
+    if file_path.lower().endswith(('.tif', '.tiff')):
+        write_tiff_strips(file_path, layout['width'], layout['height'], strips, dpi)
+    else:
+        write_png_strips(file_path, layout['width'], layout['height'], strips, dpi)
+    return layout['width'], layout['height']
+
+
+DEFAULT_STYLE = {
+    'fg': '#000000',
+    'bg': '#FFFFFF',
+    'frame': True,
+    'frame_text': 'SCAN ME',
+    'logo_bg': '#FFFFFF',
+    'text_color': '#FFFFFF',
+    'text_bg': '#000000',
+}
+
+# Per-process render cache of the service's worker pool
+_worker_cache = None
+
+
+def init_render_worker(cache_dir, cache_mb):
+    global _worker_cache
+    if cache_dir:
+        _worker_cache = RenderCache(cache_dir, cache_mb * 1024 * 1024)
+
+
+def render_in_worker(data, style, fmt):
+    return render_payload(data, style, fmt, _worker_cache)
+
+
+def parse_render_params(params):
+    """Validate /render query parameters into (data, style, format); raises ValueError"""
+    data = params.get('data')
+    if not data:
+        raise ValueError("Missing 'data' parameter")
+    fmt = params.get('format', 'png').lower()
+    if fmt not in ('png', 'svg'):
+        raise ValueError("'format' must be png or svg")
+    if estimate_capacity(data)['version'] is None:
+        raise ValueError("Payload too long for a QR code")
+    
+    style = dict(DEFAULT_STYLE)
+    for name in ('fg', 'bg', 'logo_bg', 'text_color', 'text_bg'):
+        if name in params:
+            value = '#' + params[name].lstrip('#')
+            if not re.fullmatch(r'#[0-9a-fA-F]{6}', value):
+                raise ValueError(f"Invalid color for '{name}' (expected RRGGBB)")
+            style[name] = value
+    if 'frame' in params:
+        style['frame'] = params['frame'].lower() not in ('', '0', 'false', 'no', 'off')
+    if 'text' in params:
+        style['frame_text'] = params['text'] or 'SCAN ME'
+    return data, style, fmt
+
+
+class RenderService:
+    """Render requests on a warm process pool.
+
+    Concurrent requests for the same output share one render, and recently
+    rendered outputs are answered from memory.
+    """
+    
+    RECENT_SIZE = 1024
+    
+    def __init__(self, workers=None, cache_dir=None, cache_mb=DEFAULT_CACHE_MB):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_render_worker,
+                                        initargs=(cache_dir, cache_mb))
+        # Reentrant: a future that is already done runs its callback immediately
+        self.lock = threading.RLock()
+        self.inflight = {}
+        self.recent = OrderedDict()
+        self.latencies = deque(maxlen=10000)
+        self.requests = 0
+        self.coalesced = 0
+        
+        # Start every worker now rather than on the first requests
+        for future in [self.pool.submit(render_in_worker, 'warmup', DEFAULT_STYLE, 'png')
+                       for _ in range(self.workers)]:
+            future.result()
+    
+    def render(self, data, style, fmt):
+        key = (data, tuple(sorted(style.items())), fmt)
+        with self.lock:
+            self.requests += 1
+            if key in self.recent:
+                self.recent.move_to_end(key)
+                return self.recent[key]
+            future = self.inflight.get(key)
+            if future:
+                self.coalesced += 1
+            else:
+                future = self.pool.submit(render_in_worker, data, style, fmt)
+                self.inflight[key] = future
+                future.add_done_callback(lambda f: self.finish(key, f))
+        return future.result()
+    
+    def finish(self, key, future):
+        with self.lock:
+            self.inflight.pop(key, None)
+            if not future.cancelled() and future.exception() is None:
+                self.recent[key] = future.result()
+                while len(self.recent) > self.RECENT_SIZE:
+                    self.recent.popitem(last=False)
+    
+    def record_latency(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+    
+    def stats(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+            stats = {'requests': self.requests, 'coalesced': self.coalesced,
+                     'queue_depth': len(self.inflight), 'workers': self.workers}
+        for name, fraction in (('p50_ms', 0.5), ('p95_ms', 0.95), ('p99_ms', 0.99)):
+            stats[name] = round(latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000, 2) if latencies else 0
+        return stats
+    
+    def shutdown(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """``GET /render?data=...`` returns PNG/SVG; ``GET /stats`` returns service metrics as JSON"""
+    
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes; with Nagle on, every response
+    # on a keep-alive connection would wait for the client's delayed ACK
+    disable_nagle_algorithm = True
+    service = None
+    
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == '/stats':
+            self.respond(200, 'application/json', json.dumps(self.service.stats()).encode('utf-8'))
+            return
+        if url.path != '/render':
+            self.respond(404, 'text/plain', b'Not found')
+            return
+        
+        start = time.perf_counter()
+        try:
+            data, style, fmt = parse_render_params(dict(urllib.parse.parse_qsl(url.query, keep_blank_values=True)))
+        except ValueError as e:
+            self.respond(400, 'text/plain', str(e).encode('utf-8'))
+            return
+        try:
+            body = self.service.render(data, style, fmt)
+        except Exception as e:
+            self.respond(500, 'text/plain', f"Render failed: {e}".encode('utf-8'))
+            return
+        self.service.record_latency(time.perf_counter() - start)
+        self.respond(200, 'image/png' if fmt == 'png' else 'image/svg+xml', body)
+    
+    def respond(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        # Per-request logging would dominate at high request rates
+        pass
+
+
+def serve(host='127.0.0.1', port=8765, workers=None, cache_dir=None):
+    """Run the local HTTP render service until interrupted"""
+    service = RenderService(workers, cache_dir)
+    RenderRequestHandler.service = service
+    server = ThreadingHTTPServer((host, port), RenderRequestHandler)
+    server.daemon_threads = True
+    print(f"Elsakr QR render service on http://{host}:{port}/render ({service.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+class ResultsGallery:
+    """Scrollable grid over a batch output folder or zip archive.
+
+    Only the cells in view are drawn. Thumbnails are decoded and downscaled on a
+    background thread and kept in a bounded LRU cache, so the number of
+    ``PhotoImage`` objects stays fixed no matter how many results there are.
+    """
+    
+    THUMB_SIZE = 128
+    CELL_WIDTH = 150
+    CELL_HEIGHT = 175
+    CACHE_SIZE = 400
+    
+    def __init__(self, parent, colors, source):
+        self.colors = colors
+        self.source = source
+        self.is_archive = source.lower().endswith('.zip')
+        self.items = self.load_items()
+        self.filtered = self.items
+        self.thumbnails = OrderedDict()
+        self.pending = set()
+        self.visible = set()
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.closed = False
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title(f"Batch Results - {os.path.basename(source)}")
+        self.window.geometry("900x700")
+        self.window.configure(bg=colors['bg_primary'])
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        # Filter bar
+        filter_row = tk.Frame(self.window, bg=colors['bg_primary'])
+        filter_row.pack(fill=tk.X, padx=10, pady=10)
+        tk.Label(filter_row, text="Filter (row # or text):", bg=colors['bg_primary'],
+                 fg=colors['text_primary'], font=('Segoe UI', 10)).pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar()
+        filter_entry = tk.Entry(filter_row, textvariable=self.filter_var,
+                                bg=colors['bg_tertiary'], fg=colors['text_primary'],
+                                font=('Segoe UI', 11), insertbackground=colors['text_primary'],
+                                relief=tk.FLAT, bd=0)
+        filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10, ipady=4)
+        filter_entry.bind('<KeyRelease>', self.apply_filter)
+        self.status = tk.Label(filter_row, bg=colors['bg_primary'], fg=colors['text_secondary'],
+                               font=('Segoe UI', 9))
+        self.status.pack(side=tk.LEFT)
+        
+        # Virtualized grid
+        grid_frame = tk.Frame(self.window, bg=colors['bg_secondary'])
+        grid_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self.canvas = tk.Canvas(grid_frame, bg=colors['bg_secondary'], highlightthickness=0)
+        scrollbar = ttk.Scrollbar(grid_frame, orient=tk.VERTICAL, command=self.yview)
+        self.canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.canvas.bind('<Configure>', self.redraw)
+        self.canvas.bind('<MouseWheel>', lambda e: self.yview('scroll', -e.delta // 120, 'units'))
+        self.canvas.bind('<Button-4>', lambda e: self.yview('scroll', -1, 'units'))
+        self.canvas.bind('<Button-5>', lambda e: self.yview('scroll', 1, 'units'))
+        self.canvas.configure(yscrollincrement=self.CELL_HEIGHT // 3)
+        
+        threading.Thread(target=self.decode_worker, daemon=True).start()
+        self.poll_results()
+    
+    def load_items(self):
+        """(row, file, payload, lowercased payload) for every result, from manifest.csv when present"""
+        def from_manifest(f, prefix=''):
+            return [(int(r['row']), prefix + r['file'], r['payload'], r['payload'].lower())
+                    for r in csv.DictReader(f)]
+        
+        if self.is_archive:
+            with zipfile.ZipFile(self.source) as archive:
+                names = archive.namelist()
+                manifest = next((n for n in names if os.path.basename(n) == 'manifest.csv'), None)
+                if manifest:
+                    with archive.open(manifest) as f:
+                        return from_manifest(TextIOWrapper(f, encoding='utf-8', newline=''),
+                                             manifest[:-len('manifest.csv')])
+        else:
+            manifest = os.path.join(self.source, 'manifest.csv')
+            if os.path.exists(manifest):
+                with open(manifest, encoding='utf-8', newline='') as f:
+                    return from_manifest(f)
+            names = os.listdir(self.source)
+        
+        # No manifest: take the row number from the file name and show one
+        # deliverable per row (e.g. qr_0001.png, not also qr_0001_300px.png)
+        items = []
+        rows = set()
+        for name in sorted(n for n in names if n.lower().endswith('.png')):
+            match = re.match(r'qr_(\d+)', os.path.basename(name))
+            if match:
+                row = int(match[1])
+                if row in rows:
+                    continue
+                rows.add(row)
+            items.append((int(match[1]) if match else 0, name, '', ''))
+        return items
+    
+    def decode_worker(self):
+        archive = zipfile.ZipFile(self.source) if self.is_archive else None
+        while True:
+            name = self.requests.get()
+            if name is None:
+                break
+            # Scrolled past before we got to it
+            if name not in self.visible:
+                self.results.put((name, None))
+                continue
+            
+            try:
+                f = archive.open(name) if archive else open(os.path.join(self.source, name), 'rb')
+                with f:
+                    image = Image.open(f)
+                    image.draft('RGB', (self.THUMB_SIZE, self.THUMB_SIZE))
+                    image = image.convert('RGB')
+                    image.thumbnail((self.THUMB_SIZE, self.THUMB_SIZE), Image.Resampling.BILINEAR, reducing_gap=2.0)
+            except Exception:
+                image = None
+            self.results.put((name, image))
+        if archive:
+            archive.close()
+    
+    def poll_results(self):
+        """Turn decoded thumbnails into PhotoImages on the Tk thread"""
+        if self.closed:
+            return
+        
+        refresh = False
+        while True:
+            try:
+                name, image = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending.discard(name)
+            if image is not None:
+                self.thumbnails[name] = ImageTk.PhotoImage(image)
+                while len(self.thumbnails) > self.CACHE_SIZE:
+                    self.thumbnails.popitem(last=False)
+                refresh = refresh or name in self.visible
+        
+        if refresh:
+            self.redraw()
+        self.window.after(30, self.poll_results)
+    
+    def yview(self, *args):
+        self.canvas.yview(*args)
+        self.redraw()
+    
+    def apply_filter(self, event=None):
+        text = self.filter_var.get().strip()
+        if not text:
+            self.filtered = self.items
+        else:
+            lowered = text.lower()
+            row = int(text) if text.isdigit() else None
+            self.filtered = [item for item in self.items if item[0] == row or lowered in item[3]]
+        self.canvas.yview_moveto(0)
+        self.redraw()
+    
+    def redraw(self, event=None):
+        """Draw only the cells in view, queueing thumbnails that aren't cached yet"""
+        canvas = self.canvas
+        view_height = max(canvas.winfo_height(), 1)
+        columns = max(1, canvas.winfo_width() // self.CELL_WIDTH)
+        grid_rows = -(-len(self.filtered) // columns)
+        canvas.configure(scrollregion=(0, 0, columns * self.CELL_WIDTH, max(grid_rows * self.CELL_HEIGHT, view_height)))
+        
+        top = canvas.canvasy(0)
+        first = int(top // self.CELL_HEIGHT) * columns
+        last = min(len(self.filtered), (int((top + view_height) // self.CELL_HEIGHT) + 1) * columns)
+        
+        canvas.delete('cell')
+        visible = set()
+        half = self.THUMB_SIZE // 2
+        for index in range(first, last):
+            row, name, payload, _ = self.filtered[index]
+            x = (index % columns) * self.CELL_WIDTH + self.CELL_WIDTH // 2
+            y = (index // columns) * self.CELL_HEIGHT + 8
+            visible.add(name)
+            
+            photo = self.thumbnails.get(name)
+            if photo:
+                self.thumbnails.move_to_end(name)
+                canvas.create_image(x, y + half, image=photo, tags='cell')
+            else:
+                canvas.create_rectangle(x - half, y, x + half, y + self.THUMB_SIZE,
+                                        outline=self.colors['border'], tags='cell')
+                if name not in self.pending:
+                    self.pending.add(name)
+                    self.requests.put(name)
+            
+            caption = f"#{row}  {payload}" if payload else f"#{row}"
+            if len(caption) > 24:
+                caption = caption[:23] + '…'
+            canvas.create_text(x, y + self.THUMB_SIZE + 14, text=caption, fill=self.colors['text_secondary'],
+                               font=('Segoe UI', 8), tags='cell')
+        self.visible = visible
+        self.status.configure(text=f"{len(self.filtered)} of {len(self.items)} results")
+    
+    def close(self):
+        self.closed = True
+        self.requests.put(None)
+        self.window.destroy()
+
 
 class ElsakrQRGenerator:
     def __init__(self, root):
@@ -46,6 +1458,7 @@ class ElsakrQRGenerator:
         self.fg_color = '#000000'
         self.bg_color = '#FFFFFF'
         self.logo_image = None
+        self.logo_digest = None
         self.current_qr_image = None
         self.enable_frame = tk.BooleanVar(value=True)
         self.frame_text = tk.StringVar(value='SCAN ME')
@@ -53,6 +1466,17 @@ class ElsakrQRGenerator:
         self.logo_bg_color = '#FFFFFF'
         self.text_color = '#FFFFFF'
         self.text_bg_color = '#000000'
+        # Optional persistent render cache (ELSAKR_QR_CACHE enables it at startup)
+        self.cache_dir = os.environ.get('ELSAKR_QR_CACHE') or DEFAULT_CACHE_DIR
+        self.use_cache = tk.BooleanVar(value=bool(os.environ.get('ELSAKR_QR_CACHE')))
+        self.render_cache = None
+        self.current_qr_png = None
+        self.current_qr_matrix = None
+        self.export_profile = tk.StringVar(value=DEFAULT_PROFILE)
+        # Set while a sequence run is in progress; setting the event cancels it
+        self.sequence_cancel = None
+        if self.use_cache.get():
+            self.on_cache_toggle()
         
         # Configure styles
         self.configure_styles()
@@ -181,6 +1605,12 @@ class ElsakrQRGenerator:
         
         self.create_input_fields()
         
+        # Live version/capacity estimate for the current input
+        self.capacity_label = ttk.Label(left_inner, text="", style='Subheader.TLabel',
+                                        background=self.colors['bg_secondary'], font=('Segoe UI', 9))
+        self.capacity_label.pack(anchor='w', pady=(0, 15))
+        self.update_capacity()
+        
         # Color selection
         color_frame = ttk.Frame(left_inner, style='Card.TFrame')
         color_frame.pack(fill=tk.X, pady=(0, 20))
@@ -253,6 +1683,22 @@ class ElsakrQRGenerator:
                  command=self.batch_import, relief=tk.FLAT, padx=15, pady=8,
                  cursor='hand2').pack(side=tk.LEFT)
         
+        tk.Button(batch_frame, text="🔢 Sequence", bg=self.colors['bg_tertiary'],
+                 fg=self.colors['text_primary'], font=('Segoe UI', 10),
+                 command=self.generate_sequence, relief=tk.FLAT, padx=15, pady=8,
+                 cursor='hand2').pack(side=tk.LEFT, padx=(10, 0))
+        
+        tk.Checkbutton(batch_frame, text="Use Render Cache", variable=self.use_cache,
+                      bg=self.colors['bg_secondary'], fg=self.colors['text_primary'],
+                      selectcolor=self.colors['bg_tertiary'], activebackground=self.colors['bg_secondary'],
+                      activeforeground=self.colors['text_primary'],
+                      font=('Segoe UI', 10), command=self.on_cache_toggle).pack(side=tk.LEFT, padx=10)
+        
+        tk.Button(batch_frame, text="🖼 Browse Results", bg=self.colors['bg_tertiary'],
+                 fg=self.colors['text_primary'], font=('Segoe UI', 10),
+                 command=self.browse_results, relief=tk.FLAT, padx=15, pady=8,
+                 cursor='hand2').pack(side=tk.LEFT)
+        
         # Frame settings
         frame_settings = ttk.Frame(left_inner, style='Card.TFrame')
         frame_settings.pack(fill=tk.X, pady=(0, 20))
@@ -342,6 +1788,12 @@ class ElsakrQRGenerator:
         self.qr_label = ttk.Label(preview_frame, background='white')
         self.qr_label.pack(expand=True)
         
+        # Readback check of the rendered image
+        self.verify_label = ttk.Label(right_inner, text="", style='Subheader.TLabel',
+                                      background=self.colors['bg_secondary'], font=('Segoe UI', 9),
+                                      wraplength=400)
+        self.verify_label.pack(fill=tk.X)
+        
         # Download buttons
         btn_frame = ttk.Frame(right_inner, style='Card.TFrame')
         btn_frame.pack(fill=tk.X, pady=(20, 0))
@@ -356,11 +1808,29 @@ class ElsakrQRGenerator:
                  command=lambda: self.save_qr('svg'), relief=tk.FLAT,
                  padx=15, pady=10, cursor='hand2').pack(side=tk.LEFT, expand=True, fill=tk.X, padx=(5, 0))
         
+        # Export profile: several deliverables from one encode
+        ttk.Label(right_inner, text="Export Profile (also used for batch)", style='TLabel',
+                 background=self.colors['bg_secondary']).pack(anchor='w', pady=(10, 0))
+        profile_row = ttk.Frame(right_inner, style='Card.TFrame')
+        profile_row.pack(fill=tk.X, pady=(5, 0))
+        ttk.Combobox(profile_row, textvariable=self.export_profile, values=list(EXPORT_PROFILES),
+                     state='readonly').pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+        tk.Button(profile_row, text="📦 Export", bg=self.colors['bg_tertiary'],
+                 fg=self.colors['text_primary'], font=('Segoe UI', 10),
+                 command=self.save_profile, relief=tk.FLAT,
+                 padx=15, pady=6, cursor='hand2').pack(side=tk.LEFT)
+        
         # Copy button
         tk.Button(right_inner, text="📋 Copy to Clipboard", bg=self.colors['bg_tertiary'],
                  fg=self.colors['text_primary'], font=('Segoe UI', 10),
                  command=self.copy_to_clipboard, relief=tk.FLAT,
                  padx=15, pady=10, cursor='hand2').pack(fill=tk.X, pady=(10, 0))
+        
+        # Print-size export
+        tk.Button(right_inner, text="🖨 Print Export (PNG/TIFF)", bg=self.colors['bg_tertiary'],
+                 fg=self.colors['text_primary'], font=('Segoe UI', 10),
+                 command=self.save_print, relief=tk.FLAT,
+                 padx=15, pady=10, cursor='hand2').pack(fill=tk.X, pady=(10, 0))
     
     def create_input_fields(self):
         # Clear existing fields
@@ -411,6 +1881,7 @@ class ElsakrQRGenerator:
                         relief=tk.FLAT, bd=0)
         entry.insert(0, default)
         entry.pack(fill=tk.X, pady=5, ipady=8, padx=2)
+        entry.bind('<KeyRelease>', self.update_capacity)
         
         setattr(self, name, entry)
     
@@ -427,6 +1898,7 @@ class ElsakrQRGenerator:
         text.pack(fill=tk.X, pady=5)
         if default:
             text.insert("1.0", default)
+        text.bind('<KeyRelease>', self.update_capacity)
         
         setattr(self, name, text)
     
@@ -440,11 +1912,26 @@ class ElsakrQRGenerator:
         var = tk.StringVar(value=options[0])
         dropdown = ttk.Combobox(frame, textvariable=var, values=options, state='readonly')
         dropdown.pack(fill=tk.X, pady=5)
+        dropdown.bind('<<ComboboxSelected>>', self.update_capacity)
         
         setattr(self, name, var)
     
     def on_type_change(self):
         self.create_input_fields()
+        self.update_capacity()
+    
+    def update_capacity(self, event=None):
+        """Show the version and remaining capacity the current input will encode to"""
+        estimate = estimate_capacity(self.get_qr_data())
+        if estimate['version'] is None:
+            self.capacity_label.configure(
+                text=f"⚠️ Too long: {-estimate['remaining_bits'] // 8} bytes over the largest QR code",
+                foreground='#ef4444')
+        else:
+            self.capacity_label.configure(
+                text=f"Version {estimate['version']} · {estimate['modules']}×{estimate['modules']} modules · "
+                     f"{estimate['remaining_bits'] // 8} bytes left",
+                foreground=self.colors['text_secondary'])
     
     def choose_color(self, color_type):
         color = colorchooser.askcolor(title=f"Choose {'QR' if color_type == 'fg' else 'Background'} Color")
@@ -470,6 +1957,19 @@ class ElsakrQRGenerator:
         else:
             self.frame_text_entry.configure(state='disabled')
 
+    def on_cache_toggle(self):
+        """Open or drop the persistent render cache based on checkbox"""
+        if not self.use_cache.get():
+            self.render_cache = None
+            return
+        try:
+            max_mb = int(os.environ.get('ELSAKR_QR_CACHE_MB', DEFAULT_CACHE_MB))
+            self.render_cache = RenderCache(self.cache_dir, max_mb * 1024 * 1024)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            self.use_cache.set(False)
+            self.render_cache = None
+            messagebox.showerror("Error", f"Failed to open render cache:\n{e}")
+
     def choose_frame_color(self, color_type):
         """Choose color for frame elements"""
         titles = {
@@ -518,6 +2018,7 @@ class ElsakrQRGenerator:
     
     def remove_logo(self):
         self.logo_image = None
+        self.logo_digest = None
         self.logo_label.configure(text="No logo selected")
     
     def upload_logo(self):
@@ -528,6 +2029,7 @@ class ElsakrQRGenerator:
         if file_path:
             try:
                 self.logo_image = Image.open(file_path)
+                self.logo_digest = hashlib.sha256(self.logo_image.tobytes()).hexdigest()
                 self.logo_label.configure(text=os.path.basename(file_path))
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load logo: {e}")
@@ -585,75 +2087,28 @@ class ElsakrQRGenerator:
         
         return 'https://elsakr.company'
     
-    def generate_qr(self, data=None):
+    def generate_qr(self, data=None, version=None):
         if data is None:
             data = self.get_qr_data()
         
-        # Create QR code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_H,
-            box_size=10,
-            border=2
-        )
-        qr.add_data(data)
-        qr.make(fit=True)
-        
-        # Create black and white QR image first
-        qr_image = qr.make_image(fill_color='black', back_color='white')
-        
-        # Convert to PIL Image
-        if hasattr(qr_image, 'get_image'):
-            qr_image = qr_image.get_image()
-        
-        # Convert to RGB
-        qr_image = qr_image.convert('RGB')
-        
-        # Manually replace colors using PIL
-        # Get pixel data
-        pixels = qr_image.load()
-        width, height = qr_image.size
-        
-        # Parse hex colors to RGB tuples
-        def hex_to_rgb(hex_color):
-            hex_color = hex_color.lstrip('#')
-            return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-        
-        fg_rgb = hex_to_rgb(self.fg_color)
-        bg_rgb = hex_to_rgb(self.bg_color)
-        
-        # Replace black with foreground color, white with background color
-        for y in range(height):
-            for x in range(width):
-                r, g, b = pixels[x, y]
-                # If pixel is dark (black), use foreground color
-                if r < 128 and g < 128 and b < 128:
-                    pixels[x, y] = fg_rgb
-                else:
-                    # If pixel is light (white), use background color
-                    pixels[x, y] = bg_rgb
-        
-        # Add logo in center ONLY if frame is disabled (when frame is enabled, logo goes on top inside frame)
-        if self.logo_image and not self.enable_frame.get():
-            logo = self.logo_image.copy()
-            logo_size = int(qr_image.size[0] * 0.25)
-            logo = logo.resize((logo_size, logo_size), Image.Resampling.LANCZOS)
-            
-            # Create background for logo matching QR bg color
-            bg = Image.new('RGB', (logo_size + 10, logo_size + 10), bg_rgb)
-            pos = ((qr_image.size[0] - logo_size - 10) // 2, (qr_image.size[1] - logo_size - 10) // 2)
-            qr_image.paste(bg, pos)
-            
-            # Paste logo
-            logo_pos = ((qr_image.size[0] - logo_size) // 2, (qr_image.size[1] - logo_size) // 2)
-            if logo.mode == 'RGBA':
-                qr_image.paste(logo.convert('RGB'), logo_pos)
-            else:
-                qr_image.paste(logo, logo_pos)
-        
-        # Add frame if enabled
-        if self.enable_frame.get():
-            qr_image = self.add_frame_to_qr(qr_image, fg_rgb, bg_rgb, self.frame_text.get() or 'SCAN ME')
+        # Consult the persistent cache before rendering; only verified renders are cached
+        qr_image = None
+        self.current_qr_png = None
+        self.current_qr_matrix = None
+        self.verification = None
+        if self.render_cache:
+            style = self.get_style_hash()
+            self.current_qr_png = self.render_cache.get(data, qrcode.constants.ERROR_CORRECT_H, style, 'png')
+            if self.current_qr_png:
+                qr_image = Image.open(BytesIO(self.current_qr_png)).convert('RGB')
+        
+        if qr_image is None:
+            qr_image = self.render_qr(data, version)
+            if self.render_cache and self.verification['ok']:
+                output = BytesIO()
+                qr_image.save(output, 'PNG')
+                self.current_qr_png = output.getvalue()
+                self.render_cache.put(data, qrcode.constants.ERROR_CORRECT_H, style, 'png', self.current_qr_png)
         
         self.current_qr_image = qr_image
         
@@ -665,113 +2120,37 @@ class ElsakrQRGenerator:
         display_img = qr_image.resize(new_size, Image.Resampling.LANCZOS)
         self.qr_photo = ImageTk.PhotoImage(display_img)
         self.qr_label.configure(image=self.qr_photo)
-    
-    def add_frame_to_qr(self, qr_image, fg_rgb, bg_rgb, frame_text):
-        """Add a decorative frame with logo on top, QR in middle, text at bottom"""
-        from PIL import ImageFont
-        
-        # Parse frame colors
-        def hex_to_rgb(hex_color):
-            hex_color = hex_color.lstrip('#')
-            return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-        
-        logo_bg_rgb = hex_to_rgb(self.logo_bg_color)
-        text_color_rgb = hex_to_rgb(self.text_color)
-        text_bg_rgb = hex_to_rgb(self.text_bg_color)
-        
-        padding = 20
-        border_width = 10
-        text_height = 50
-        border_radius = 20
-        logo_area_height = 80 if self.logo_image else 0
-        logo_size = 60
-        
-        total_width = qr_image.width + (padding * 2) + (border_width * 2)
-        total_height = qr_image.height + (padding * 2) + (border_width * 2) + text_height + logo_area_height
-        
-        # Create new image for framed QR
-        framed = Image.new('RGB', (total_width, total_height), bg_rgb)
-        draw = ImageDraw.Draw(framed)
-        
-        # Draw outer rounded rectangle border
-        draw.rounded_rectangle(
-            [0, 0, total_width - 1, total_height - 1],
-            radius=border_radius,
-            fill=fg_rgb,
-            outline=fg_rgb
-        )
-        
-        # Draw inner rounded rectangle (background)
-        draw.rounded_rectangle(
-            [border_width, border_width, total_width - border_width - 1, total_height - border_width - 1],
-            radius=border_radius - 5,
-            fill=bg_rgb,
-            outline=bg_rgb
-        )
-        
-        current_y = border_width + padding
-        
-        # Draw logo at top if present
-        if self.logo_image:
-            logo = self.logo_image.copy()
-            # Resize logo
-            logo = logo.resize((logo_size, logo_size), Image.Resampling.LANCZOS)
-            
-            # Draw logo background
-            logo_bg_x = (total_width - logo_size - 20) // 2
-            logo_bg_y = current_y
-            draw.rounded_rectangle(
-                [logo_bg_x, logo_bg_y, logo_bg_x + logo_size + 20, logo_bg_y + logo_size + 10],
-                radius=8,
-                fill=logo_bg_rgb
-            )
-            
-            # Paste logo
-            logo_x = (total_width - logo_size) // 2
-            logo_y = current_y + 5
-            if logo.mode == 'RGBA':
-                framed.paste(logo.convert('RGB'), (logo_x, logo_y))
-            else:
-                framed.paste(logo, (logo_x, logo_y))
-            
-            current_y += logo_size + 20
-        
-        # Paste QR code
-        qr_x = border_width + padding
-        qr_y = current_y
-        framed.paste(qr_image, (qr_x, qr_y))
-        
-        current_y += qr_image.height + 5
-        
-        # Draw text background
-        text_bg_padding = 10
-        text_bg_width = total_width - (border_width * 2) - (padding * 2) + (text_bg_padding * 2)
-        text_bg_x = border_width + padding - text_bg_padding
-        text_bg_y = current_y
-        draw.rounded_rectangle(
-            [text_bg_x, text_bg_y, text_bg_x + text_bg_width, text_bg_y + text_height - 10],
-            radius=8,
-            fill=text_bg_rgb
-        )
         
-        # Draw frame text
-        try:
-            font = ImageFont.truetype("arial.ttf", 24)
-        except:
-            try:
-                font = ImageFont.truetype("Arial.ttf", 24)
-            except:
-                font = ImageFont.load_default()
-        
-        text = frame_text.upper()
-        text_bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = text_bbox[2] - text_bbox[0]
-        text_x = (total_width - text_width) // 2
-        text_y = current_y + (text_height - 10) // 2 - (text_bbox[3] - text_bbox[1]) // 2
-        
-        draw.text((text_x, text_y), text, fill=text_color_rgb, font=font)
-        
-        return framed
+        if self.verification is None:
+            self.verify_label.configure(text="✅ Verified (cached render)", foreground='#22c55e')
+        elif self.verification['ok']:
+            self.verify_label.configure(
+                text=f"✅ Verified: {self.verification['damage']:.0%} damage "
+                     f"(budget {self.verification['budget']:.0%}), contrast {self.verification['contrast']:.1f}:1",
+                foreground='#22c55e')
+        else:
+            self.verify_label.configure(text="⚠️ " + "; ".join(self.verification['problems']),
+                                        foreground='#ef4444')
+    
+    def render_qr(self, data, version=None):
+        """Render the styled QR image for data with the current settings and verify it"""
+        matrix = build_qr(data, version).get_matrix()
+        style = self.get_style()
+        qr_image = render_qr(matrix, style, self.logo_image)
+        self.current_qr_matrix = matrix
+        self.verification = verify_render(qr_image, matrix, style, self.logo_image is not None)
+        return qr_image
+    
+    def get_style(self):
+        return {
+            'fg': self.fg_color,
+            'bg': self.bg_color,
+            'frame': self.enable_frame.get(),
+            'frame_text': self.frame_text.get() or 'SCAN ME',
+            'logo_bg': self.logo_bg_color,
+            'text_color': self.text_color,
+            'text_bg': self.text_bg_color,
+        }
     
     def save_qr(self, format_type):
         if self.current_qr_image is None:
@@ -785,11 +2164,11 @@ class ElsakrQRGenerator:
                 initialname="elsakr-qrcode.png"
             )
             if file_path:
-                self.current_qr_image.save(file_path, 'PNG')
+                self.write_current_png(file_path)
                 messagebox.showinfo("Success", f"QR code saved to:\n{file_path}")
         
         elif format_type == 'svg':
-            # For SVG, regenerate using qrcode library
+            # For SVG, regenerate as vectors from the module matrix
             data = self.get_qr_data()
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".svg",
@@ -797,20 +2176,83 @@ class ElsakrQRGenerator:
                 initialname="elsakr-qrcode.svg"
             )
             if file_path:
-                import qrcode.image.svg
-                factory = qrcode.image.svg.SvgPathImage
-                qr = qrcode.QRCode(
-                    version=1,
-                    error_correction=qrcode.constants.ERROR_CORRECT_H,
-                    box_size=10,
-                    border=2
-                )
-                qr.add_data(data)
-                qr.make(fit=True)
-                img = qr.make_image(image_factory=factory)
-                img.save(file_path)
+                if self.logo_image is None:
+                    svg = render_payload(data, self.get_style(), 'svg', self.render_cache)
+                else:
+                    svg = matrix_to_svg(build_qr(data).get_matrix(), self.get_style(), self.logo_image)
+                with open(file_path, 'wb') as f:
+                    f.write(svg)
                 messagebox.showinfo("Success", f"QR code saved to:\n{file_path}")
     
+    def save_print(self):
+        """Export the current QR at a physical size and DPI, rendered in strips"""
+        width = simpledialog.askfloat("Print Export", "Print width (inches):",
+                                      initialvalue=4.0, minvalue=0.1, parent=self.root)
+        if not width:
+            return
+        dpi = simpledialog.askinteger("Print Export", "Resolution (DPI):",
+                                      initialvalue=300, minvalue=72, maxvalue=4800, parent=self.root)
+        if not dpi:
+            return
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".png",
+            filetypes=[("PNG files", "*.png"), ("TIFF files", "*.tif *.tiff")],
+            initialfile="elsakr-qrcode-print.png"
+        )
+        if not file_path:
+            return
+        
+        try:
+            matrix = build_qr(self.get_qr_data()).get_matrix()
+            width_px, height_px = export_print(matrix, self.get_style(), self.logo_image, file_path, width, dpi)
+            messagebox.showinfo("Success", f"Print file saved to:\n{file_path}\n\n"
+                                f"{width_px} x {height_px} px ({width_px / dpi:.2f} x {height_px / dpi:.2f} in at {dpi} DPI)")
+        except Exception as e:
+            messagebox.showerror("Error", f"Print export failed:\n{e}")
+    
+    def current_png_bytes(self):
+        """The current QR encoded as PNG, encoding it at most once"""
+        if not self.current_qr_png:
+            output = BytesIO()
+            self.current_qr_image.save(output, 'PNG')
+            self.current_qr_png = output.getvalue()
+        return self.current_qr_png
+    
+    def write_current_png(self, file_path):
+        with open(file_path, 'wb') as f:
+            f.write(self.current_png_bytes())
+    
+    def render_profile(self, data, version=None):
+        """Bytes of every deliverable in the selected export profile, in profile order.
+
+        Must follow ``generate_qr(data)``: its matrix and PNG are reused, so the
+        payload is encoded once for the whole profile.
+        """
+        matrix = self.current_qr_matrix or build_qr(data, version).get_matrix()
+        style = self.get_style()
+        for fmt, width in EXPORT_PROFILES[self.export_profile.get()]:
+            if fmt == 'png' and width is None:
+                yield self.current_png_bytes()
+            else:
+                yield render_deliverable(matrix, style, self.logo_image, fmt, width)
+    
+    def save_profile(self):
+        output_folder = filedialog.askdirectory(title="Select Output Folder")
+        if not output_folder:
+            return
+        
+        try:
+            data = self.get_qr_data()
+            self.generate_qr(data)
+            profile = EXPORT_PROFILES[self.export_profile.get()]
+            names = [f"elsakr-qrcode{deliverable_suffix(fmt, width)}" for fmt, width in profile]
+            for name, content in zip(names, self.render_profile(data)):
+                with open(os.path.join(output_folder, name), 'wb') as f:
+                    f.write(content)
+            messagebox.showinfo("Success", f"Saved {len(names)} files to:\n{output_folder}\n\n" + "\n".join(names))
+        except Exception as e:
+            messagebox.showerror("Error", f"Export failed:\n{e}")
+    
     def copy_to_clipboard(self):
         if self.current_qr_image is None:
             messagebox.showwarning("Warning", "Generate a QR code first!")
@@ -839,6 +2281,34 @@ class ElsakrQRGenerator:
         except ImportError:
             messagebox.showinfo("Info", "Install pywin32 for clipboard support.\nUse 'Save PNG' instead.")
     
+    def browse_results(self):
+        """Open the results browser on a batch output folder (pick any file in it) or zip archive"""
+        file_path = filedialog.askopenfilename(
+            title="Select Batch Results (manifest.csv, any QR image, or a ZIP archive)",
+            filetypes=[("Batch results", "*.csv *.png *.zip")]
+        )
+        if not file_path:
+            return
+        source = file_path if file_path.lower().endswith('.zip') else os.path.dirname(file_path)
+        try:
+            ResultsGallery(self.root, self.colors, source)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to open results:\n{e}")
+    
+    def get_style_key(self):
+        """Everything besides the payload that affects the rendered image"""
+        return tuple(sorted(self.get_style().items())) + (self.logo_digest,)
+    
+    def get_style_hash(self):
+        return style_hash(self.get_style(), self.logo_digest)
+    
+    def link_or_copy(self, source, target):
+        """Hardlink target to an already written file, copying where links aren't supported"""
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+    
     def batch_import(self):
         file_path = filedialog.askopenfilename(
             title="Select Text File",
@@ -856,21 +2326,232 @@ class ElsakrQRGenerator:
             with open(file_path, 'r', encoding='utf-8') as f:
                 lines = [line.strip() for line in f if line.strip()]
             
+            # Identical (payload, style) pairs are rendered once and the rest are
+            # hardlinked (or copied) from the first output
+            style_key = repr(self.get_style_key())
+            rendered = {}
+            checks = {}
+            manifest = []
             count = 0
-            for i, line in enumerate(lines):
-                self.generate_qr(data=line)
-                if self.current_qr_image:
-                    output_path = os.path.join(output_folder, f"qr_{i+1:04d}.png")
-                    self.current_qr_image.save(output_path, 'PNG')
-                    count += 1
+            duplicates = 0
+            render_time = 0.0
+            
+            # Bucket rows by their estimated version so rows sharing a symbol size
+            # run back to back and skip the fitting pass; rows that can't fit are skipped
+            versions = [estimate_capacity(line)['version'] for line in lines]
+            too_long = versions.count(None)
+            order = sorted((i for i, version in enumerate(versions) if version), key=lambda i: versions[i])
+            profile = EXPORT_PROFILES[self.export_profile.get()]
+            for i in order:
+                line = lines[i]
+                output_paths = [os.path.join(output_folder, f"qr_{i+1:04d}{deliverable_suffix(fmt, width)}")
+                                for fmt, width in profile]
+                # Never write through a hardlink left over from a previous run
+                for output_path in output_paths:
+                    if os.path.exists(output_path):
+                        os.remove(output_path)
+                
+                digest = hashlib.sha256(f"{style_key}\n{line}".encode('utf-8')).hexdigest()
+                source = rendered.get(digest)
+                if source:
+                    for source_path, output_path in zip(source, output_paths):
+                        self.link_or_copy(source_path, output_path)
+                    duplicates += 1
+                else:
+                    start = time.perf_counter()
+                    self.generate_qr(data=line, version=versions[i])
+                    if not self.current_qr_image:
+                        continue
+                    for output_path, content in zip(output_paths, self.render_profile(line, versions[i])):
+                        with open(output_path, 'wb') as f:
+                            f.write(content)
+                    render_time += time.perf_counter() - start
+                    rendered[digest] = source = output_paths
+                    if self.verification is None or self.verification['ok']:
+                        checks[digest] = 'ok'
+                    else:
+                        checks[digest] = '; '.join(self.verification['problems'])
+                count += 1
+                manifest.append((i + 1, os.path.basename(output_paths[0]), os.path.basename(source[0]), line,
+                                 checks[digest]))
             
-            messagebox.showinfo("Batch Complete", f"Generated {count} QR codes in:\n{output_folder}")
+            with open(os.path.join(output_folder, 'manifest.csv'), 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['row', 'file', 'source', 'payload', 'check'])
+                writer.writerows(sorted(manifest))
+            
+            dedup_ratio = duplicates / count if count else 0
+            time_saved = render_time / len(rendered) * duplicates if rendered else 0
+            summary = (f"Generated {count} QR codes in:\n{output_folder}\n\n"
+                       f"Unique renders: {len(rendered)}\n"
+                       f"Duplicates reused: {duplicates} ({dedup_ratio:.0%})\n"
+                       f"Estimated time saved: {time_saved:.1f}s" +
+                       (f"\nSkipped (too long): {too_long}" if too_long else ""))
+            failed = sorted(row[0] for row in manifest if row[4] != 'ok')
+            if failed:
+                summary += (f"\n\n⚠️ {len(failed)} failed verification (rows "
+                            f"{', '.join(map(str, failed[:10]))}{'…' if len(failed) > 10 else ''}); "
+                            f"see the 'check' column in manifest.csv")
+            if messagebox.askyesno("Batch Complete", summary + "\n\nBrowse the results now?"):
+                ResultsGallery(self.root, self.colors, output_folder)
         
         except Exception as e:
             messagebox.showerror("Error", f"Batch processing failed:\n{e}")
 
+    
+    def generate_sequence(self):
+        """Generate a serial run like ``https://elsakr.company/t/{n:06d}`` over ``1-999999``
+        without an input file"""
+        if self.sequence_cancel is not None:
+            messagebox.showwarning("Warning", "A sequence is already being generated.")
+            return
+        template = simpledialog.askstring("Sequence", "Template ({n} is the counter):",
+                                          initialvalue="https://elsakr.company/t/{n:06d}", parent=self.root)
+        if not template:
+            return
+        spec = simpledialog.askstring("Sequence", "Range (START-END or START-END:STEP):",
+                                      initialvalue="1-100", parent=self.root)
+        if not spec:
+            return
+        
+        try:
+            prefix, suffix = split_template(template)
+            numbers = parse_range(spec)
+            # The counter's largest and smallest values bound the encoded length
+            encoder = SequenceEncoder(prefix, [suffix.format(n, n=n) for n in (numbers[0], numbers[-1])])
+        except (ValueError, IndexError, KeyError) as e:
+            messagebox.showerror("Error", f"Invalid sequence:\n{e}")
+            return
+        
+        output_folder = filedialog.askdirectory(title="Select Output Folder")
+        if not output_folder:
+            return
+        
+        # Generate on a worker thread so the window stays responsive for long runs;
+        # progress comes back through a queue polled from the Tk thread
+        self.sequence_cancel = threading.Event()
+        events = queue.Queue()
+        window = tk.Toplevel(self.root)
+        window.title("Generating Sequence")
+        window.configure(bg=self.colors['bg_primary'])
+        window.resizable(False, False)
+        window.protocol("WM_DELETE_WINDOW", self.sequence_cancel.set)
+        status = tk.Label(window, text=f"0/{len(numbers)}", width=32, bg=self.colors['bg_primary'],
+                          fg=self.colors['text_primary'], font=('Segoe UI', 10))
+        status.pack(padx=20, pady=(15, 10))
+        tk.Button(window, text="Cancel", bg=self.colors['bg_tertiary'],
+                  fg=self.colors['text_primary'], font=('Segoe UI', 10),
+                  command=self.sequence_cancel.set, relief=tk.FLAT, padx=15, pady=6,
+                  cursor='hand2').pack(pady=(0, 15))
+        
+        # The worker gets its own copy of the settings, so editing them mid-run is safe
+        logo = self.logo_image.copy() if self.logo_image is not None else None
+        profile = EXPORT_PROFILES[self.export_profile.get()]
+        threading.Thread(target=self.run_sequence, daemon=True,
+                         args=(prefix, suffix, numbers, encoder, output_folder, self.get_style(), profile, logo,
+                               self.sequence_cancel, events)).start()
+        self.poll_sequence(events, window, status, len(numbers), output_folder, encoder.version)
+    
+    def run_sequence(self, prefix, suffix, numbers, encoder, output_folder, style, profile, logo, cancel, events):
+        """Worker thread: write every row of a sequence, reporting through events"""
+        width = max(4, len(str(numbers[-1])))
+        encode_time = 0.0
+        write_time = 0.0
+        failed = []
+        count = 0
+        
+        try:
+            # Rows are generated and written one at a time, so a run of any length
+            # holds a single code in memory and the manifest is streamed
+            with open(os.path.join(output_folder, 'manifest.csv'), 'w', encoding='utf-8', newline='') as manifest:
+                writer = csv.writer(manifest)
+                writer.writerow(['row', 'file', 'source', 'payload', 'check'])
+                for row, n in enumerate(numbers, 1):
+                    if cancel.is_set():
+                        break
+                    start = time.perf_counter()
+                    data = prefix + suffix.format(n, n=n)
+                    matrix = encoder.encode(data[len(prefix):]).get_matrix()
+                    encoded = time.perf_counter()
+                    
+                    image = render_qr(matrix, style, logo)
+                    verification = verify_render(image, matrix, style, logo is not None)
+                    names = [f"qr_{n:0{width}d}{deliverable_suffix(fmt, size)}" for fmt, size in profile]
+                    for name, (fmt, size) in zip(names, profile):
+                        path = os.path.join(output_folder, name)
+                        if fmt == 'png' and size is None:
+                            image.save(path, 'PNG')
+                        else:
+                            with open(path, 'wb') as f:
+                                f.write(render_deliverable(matrix, style, logo, fmt, size))
+                    check = 'ok' if verification['ok'] else '; '.join(verification['problems'])
+                    if check != 'ok':
+                        failed.append(n)
+                    # The row is the counter, like the number in the file name
+                    writer.writerow([n, names[0], names[0], data, check])
+                    encode_time += encoded - start
+                    write_time += time.perf_counter() - encoded
+                    count = row
+                    
+                    if row % 100 == 0:
+                        events.put(('progress', row))
+        except Exception as e:
+            events.put(('error', e))
+            return
+        events.put(('done', {'count': count, 'cancelled': cancel.is_set(), 'failed': failed,
+                             'encode_time': encode_time, 'write_time': write_time}))
+    
+    def poll_sequence(self, events, window, status, total, output_folder, version):
+        """Show a sequence run's progress on the Tk thread and report when it ends"""
+        while True:
+            try:
+                kind, value = events.get_nowait()
+            except queue.Empty:
+                self.root.after(100, self.poll_sequence, events, window, status, total, output_folder, version)
+                return
+            if kind == 'progress':
+                status.configure(text=f"{value}/{total}" +
+                                 (" — cancelling…" if self.sequence_cancel.is_set() else ""))
+                self.root.title(f"Elsakr QR Code Generator — {value}/{total}")
+                continue
+            break
+        
+        window.destroy()
+        self.sequence_cancel = None
+        self.root.title("Elsakr QR Code Generator")
+        if kind == 'error':
+            messagebox.showerror("Error", f"Sequence generation failed:\n{value}")
+            return
+        
+        summary = (f"{'Cancelled after' if value['cancelled'] else 'Generated'} {value['count']} of {total} "
+                   f"QR codes (version {version}) in:\n{output_folder}\n\n"
+                   f"Encoding: {value['encode_time']:.1f}s\n"
+                   f"Rendering and writing: {value['write_time']:.1f}s")
+        failed = value['failed']
+        if failed:
+            summary += (f"\n\n⚠️ {len(failed)} failed verification ("
+                        f"{', '.join(map(str, failed[:10]))}{'…' if len(failed) > 10 else ''}); "
+                        f"see the 'check' column in manifest.csv")
+        if messagebox.askyesno("Sequence Complete", summary + "\n\nBrowse the results now?"):
+            ResultsGallery(self.root, self.colors, output_folder)
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Elsakr QR Code Generator")
+    parser.add_argument('--serve', action='store_true',
+                        help="run the local HTTP render service instead of the desktop app")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="render processes (default: CPU count)")
+    parser.add_argument('--cache', metavar='DIR', default=os.environ.get('ELSAKR_QR_CACHE'),
+                        help="persistent render cache directory for the service")
+    args = parser.parse_args()
+    
+    if args.serve:
+        serve(args.host, args.port, args.workers, args.cache)
+        return
+    
     root = tk.Tk()
     app = ElsakrQRGenerator(root)
     root.mainloop()